@@ -2,95 +2,214 @@
 # Full Phase 1 Implementation of Perf-Report-Tool
 
 import os
+import re
+import csv
 import json
+import functools
+import importlib.util
+import tempfile
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import argparse
-import pandas as pd
-import plotly.express as px
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 from pathlib import Path
 
-
-
+try:                                # optional, C-level JSON parser
+    import orjson
+except ImportError:
+    orjson = None
+
+# pandas, numpy, plotly and jinja2 are imported inside the functions that use
+# them, so `--help` and argument errors do not pay their import cost.
+
+COLLAPSED_CHUNK_LINES = 1_000_000
+MAX_BARS = 50
+# Part of every Feather cache file name: bump it whenever a cached parser's
+# output changes, so caches written by older parsers are never served.
+FEATHER_CACHE_VERSION = 3
+# os.umask() can only be read by setting it, which is not thread-safe, so read
+# it once at import (the parsers later run in worker threads)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+# Arrow-backed strings are far smaller than Python str objects and hash in C;
+# fall back to pandas' own string dtype when pyarrow is not installed.
+STRING_DTYPE = "string[pyarrow]" if importlib.util.find_spec("pyarrow") else "string"
+
+
+def _loads(data):
+    # both orjson.loads and json.loads accept raw bytes, skipping a str decode
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is strict RFC 8259, but Google Benchmark writes NaN /
+            # Infinity for non-finite doubles, which stdlib json accepts
+            pass
+    return json.loads(data)
+
+
+def _load_json(path):
+    with open(path, 'rb') as f:
+        return _loads(f.read())
+
+
+def _feather_cached(parse):
+    """
+    Cache parse(src_path) as a Feather file next to src_path and reuse it while it
+    is at least as new as the source. Without pyarrow the parser simply runs uncached.
+    The file is written under a temp name and renamed into place, so concurrent runs
+    never read a half-written cache.
+    """
+    @functools.wraps(parse)
+    def wrapper(src_path):
+        import pandas as pd
+
+        cached = Path(f"{src_path}.v{FEATHER_CACHE_VERSION}.feather")
+        try:
+            if cached.stat().st_mtime >= os.path.getmtime(src_path):
+                return pd.read_feather(cached)
+        except (OSError, ImportError, ValueError):
+            pass
+        df = parse(src_path)
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=cached.parent, prefix=f"{cached.name}.", suffix=".tmp")
+            os.close(fd)
+            # mkstemp creates 0600; give the shared cache the usual umask-based mode
+            os.chmod(tmp, 0o666 & ~_UMASK)
+            df.reset_index(drop=True).to_feather(tmp)
+            os.replace(tmp, cached)
+        except (OSError, ImportError, ValueError):
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+        return df
+    return wrapper
+
+
+@_feather_cached
 def parse_perf_stat(stat_path):
-    rows = []
-    with open(stat_path, 'r') as f:
-        for line in f:
-            parts = line.strip().split()
-            if len(parts) < 2:
-                continue
-            try:
-                val = parts[0].replace(",", "")
-                if '<' in val or not any(c.isdigit() for c in val):
-                    continue
-                value = float(val)
-                metric = parts[1]
-                rows.append((metric, value))
-            except ValueError:
+    import pandas as pd
+
+    # perf stat lines look like "<value> <event> [# comment] [(pct)]"; let the
+    # C parser split them and drop anything whose first field is not a number
+    # (header, "<not counted>", blank lines) or that has no event name.
+    df = pd.read_csv(stat_path, sep=r'\s+', engine='c', header=None,
+                     comment='#', usecols=[0, 1], names=["Value", "Metric"],
+                     quoting=csv.QUOTE_NONE, dtype=STRING_DTYPE,
+                     on_bad_lines='skip')
+    df["Value"] = pd.to_numeric(df["Value"].str.replace(",", "", regex=False),
+                                errors='coerce')
+    df = df.dropna().astype({"Value": "float64"})
+    return df[["Metric", "Value"]].reset_index(drop=True)
+
+
+@_feather_cached
+def _function_totals(collapsed_path):
+    import pandas as pd
+
+    # Frame names may contain spaces (C++ templates), so read whole lines and
+    # split only on the last space, which separates the stack from its count.
+    # The file is memory-mapped so the C parser reads it without going through
+    # Python-level buffered line iteration; empty files cannot be mapped.
+    # Lines are consumed in chunks and only per-stack totals are kept, so peak
+    # memory follows the number of unique stacks rather than the file size.
+    empty = pd.DataFrame({"Function": pd.Series(dtype=STRING_DTYPE),
+                          "Samples": pd.Series(dtype="int64")})
+    if os.path.getsize(collapsed_path) == 0:
+        return empty
+    stack_counts = None
+    with pd.read_csv(collapsed_path, sep='\x1f', engine='c', header=None,
+                     names=["line"], quoting=csv.QUOTE_NONE, dtype=STRING_DTYPE,
+                     memory_map=True, chunksize=COLLAPSED_CHUNK_LINES) as reader:
+        for chunk in reader:
+            lines = chunk["line"]
+            if lines.empty:
                 continue
-    return pd.DataFrame(rows, columns=["Metric", "Value"])
+            parts = (lines.str.rsplit(' ', n=1, expand=True)
+                     .reindex(columns=[0, 1]).astype(STRING_DTYPE))
+            # only plain integer counts, like int() in the old loop: no 1e3, 1.5, inf
+            counts = parts[1].where(parts[1].str.fullmatch(r"\d+"))
+            stacks = pd.DataFrame({
+                "Function": parts[0],
+                "Samples": pd.to_numeric(counts),
+            }).dropna()
+            counts = stacks.groupby("Function", sort=False)["Samples"].sum()
+            stack_counts = counts if stack_counts is None else stack_counts.add(counts, fill_value=0)
+    if stack_counts is None:
+        return empty
+
+    frames = stack_counts.reset_index()
+    frames["Function"] = frames["Function"].str.split(';')
+    frames = frames.explode("Function").astype({"Function": STRING_DTYPE})
+    func_counts = frames.groupby("Function", sort=False)["Samples"].sum()
+    return func_counts.astype("int64").reset_index()
 
 
 def parse_collapsed_stacks(collapsed_path, top_n=15):
-    stack_counts = {}
-    with open(collapsed_path, 'r') as f:
-        for line in f:
-            if ' ' not in line:
-                continue
-            try:
-                stack, count_str = line.rsplit(' ', 1)
-                count = int(count_str)
-                stack_counts[stack] = stack_counts.get(stack, 0) + count
-            except ValueError:
-                continue
-    func_counts = {}
-    for stack, count in stack_counts.items():
-        funcs = stack.split(';')
-        for func in funcs:
-            func_counts[func] = func_counts.get(func, 0) + count
-    df = pd.DataFrame(list(func_counts.items()), columns=["Function", "Samples"])
-    return df.sort_values("Samples", ascending=False).head(top_n)
+    # only top_n rows are kept, so a partial selection beats a full sort
+    return _function_totals(collapsed_path).nlargest(top_n, "Samples")
 
 
 def parse_google_benchmark(benchmark_path):
+    import pandas as pd
+
     try:
-        with open(benchmark_path, 'r') as f:
-            data = json.load(f)
-        records = []
-        for bench in data.get("benchmarks", []):
-            if "name" in bench and "cpu_time" in bench:
-                records.append((bench["name"], bench["cpu_time"]))
-        return pd.DataFrame(records, columns=["Benchmark", "CPU Time (ns)"])
+        data = _load_json(benchmark_path)
+        records = (pd.json_normalize(data.get("benchmarks", []))
+                   .reindex(columns=["name", "cpu_time"])
+                   .rename(columns={"name": "Benchmark", "cpu_time": "CPU Time (ns)"})
+                   .dropna())
+        return records.astype({"Benchmark": STRING_DTYPE}).reset_index(drop=True)
     except Exception:
         return pd.DataFrame(columns=["Benchmark", "CPU Time (ns)"])
 
 
+_MASSIF_HEAP_RE = re.compile(rb'^mem_heap_B=(\d+)', re.MULTILINE)
+
+
 def parse_valgrind_massif(massif_file):
-    sizes = []
-    with open(massif_file, 'r') as f:
-        for line in f:
-            if line.startswith("mem_heap_B="):
-                sizes.append(int(line.strip().split('=')[1]))
+    import numpy as np
+    import pandas as pd
 
-    return pd.DataFrame({"Heap Size (Bytes)": sizes, "Snapshot": range(len(sizes))})
+    with open(massif_file, 'rb') as f:
+        data = f.read()
+    sizes = np.fromiter((int(m) for m in _MASSIF_HEAP_RE.findall(data)), dtype=np.int64)
 
+    return pd.DataFrame({"Heap Size (Bytes)": sizes,
+                         "Snapshot": np.arange(len(sizes), dtype=np.int32)})
 
-def generate_bar_chart(df, x_col, y_col, title):
-    if df.empty:
-        return "<p>No data available for {}</p>".format(title)
-    
-    fig = px.bar(df, x=x_col, y=y_col, title=title)
-    fig.update_layout(margin=dict(l=40, r=40, t=60, b=40))
-    
-    return fig.to_html(full_html=False, include_plotlyjs='cdn')
 
+def _xy(df, x_col, y_col):
+    """Return the two plotted columns of df as plain numpy arrays."""
+    return df[x_col].to_numpy(), df[y_col].to_numpy()
+
+
+def generate_bar_chart(x, y, title, x_title=None, y_title=None):
+    import numpy as np
+    import plotly.graph_objects as go
+
+    if len(x) == 0:
+        return None
+
+    # Thousands of bars are unreadable and bloat the embedded JSON: keep the
+    # largest MAX_BARS - 1 in their original order and sum the rest into "other".
+    if len(x) > MAX_BARS:
+        x, y = np.asarray(x, dtype=object), np.asarray(y)
+        keep = np.sort(np.argpartition(y, -(MAX_BARS - 1))[-(MAX_BARS - 1):])
+        rest = np.ones(len(y), dtype=bool)
+        rest[keep] = False
+        x = np.append(x[keep], "other")
+        y = np.append(y[keep], y[rest].sum())
+
+    fig = go.Figure(
+        data=[go.Bar(x=x, y=y)],
+        layout=go.Layout(title=title,
+                         xaxis_title=x_title,
+                         yaxis_title=y_title,
+                         margin=dict(l=40, r=40, t=60, b=40)))
+
+    # only the figure JSON; the template draws every chart from one script block
+    return fig.to_json()
 
-from pathlib import Path
-import os, json
-from datetime import datetime
-import pandas as pd
-import plotly.express as px
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 def _unique_version_dir(base_dir: Path, requested: str) -> Path:
     """
@@ -104,12 +223,35 @@ def _unique_version_dir(base_dir: Path, requested: str) -> Path:
     return base_dir / f"{requested}_{timestamp}"
 
 
-# ------------------------------------------------------------
-# helpers (unchanged)
-# ------------------------------------------------------------
-# … parse_perf_stat, parse_collapsed_stacks, parse_google_benchmark,
-#    parse_valgrind_massif, generate_bar_chart stay exactly as before …
-# ------------------------------------------------------------
+def _newest_file(directory: Path, accept) -> Path:
+    """
+    Return the most recently modified entry of directory whose name passes accept().
+    A single scandir pass; DirEntry caches its stat result, so each file is stat'd once.
+    """
+    with os.scandir(directory) as it:
+        newest = max((e for e in it if accept(e.name)),
+                     key=lambda e: e.stat().st_mtime)
+    return Path(newest.path)
+
+
+@functools.lru_cache(maxsize=None)
+def _report_template():
+    """
+    Compile tpl/report.html once per process. Compiled bytecode is also kept in
+    Jinja2's per-user temp cache, so new processes skip parsing the template.
+    """
+    from jinja2 import (Environment, FileSystemBytecodeCache, FileSystemLoader,
+                        select_autoescape)
+
+    tpl_dir = Path(__file__).resolve().parent.parent / "tpl"
+    env = Environment(
+        loader=FileSystemLoader(tpl_dir),
+        autoescape=select_autoescape(['html']),
+        bytecode_cache=FileSystemBytecodeCache(),
+        auto_reload=False
+    )
+    return env.get_template("report.html")
+
 
 def generate_report(config_path: str,
                     data_root: str | Path,
@@ -125,8 +267,7 @@ def generate_report(config_path: str,
     :return:            full path to the generated HTML file
     """
     # ----- load config -------------------------------------------------------
-    with open(config_path) as f:
-        cfg = json.load(f)
+    cfg = _load_json(config_path)
 
     data_root = Path(data_root).resolve()
     dst_root  = Path(dst_root).resolve()
@@ -153,48 +294,62 @@ def generate_report(config_path: str,
     report_dir.mkdir(parents=True, exist_ok=True)
 
     # ----- locate newest input files ----------------------------------------
-    stat_file = max(
-        (f for f in stat_dir.iterdir() if f.name.startswith("perf-stat")),
-        key=lambda f: f.stat().st_mtime)
-    collapsed_file = max(
-        (f for f in collapsed_dir.iterdir() if f.suffix == ".txt"),
-        key=lambda f: f.stat().st_mtime)
-
-    flamegraph_files = {
-        f.name.replace("flamegraph-", "").replace(".svg", ""):
-        os.path.relpath(f, start=report_dir)
-        for f in flamegraph_dir.iterdir() if f.suffix == ".svg"
-    }
-
-    # ----- build dataframes --------------------------------------------------
-    stat_df      = parse_perf_stat(stat_file)
-    top_funcs_df = parse_collapsed_stacks(collapsed_file)
-    gb_df        = parse_google_benchmark(gb_path)
-    # heap_df     = parse_valgrind_massif(valgrind_path)
+    stat_file      = _newest_file(stat_dir, lambda name: name.startswith("perf-stat")
+                                                      and name.endswith(".txt"))
+    collapsed_file = _newest_file(collapsed_dir, lambda name: name.endswith(".txt"))
+
+    # one relpath for the directory; the links are URLs, so join with "/"
+    flamegraph_rel = Path(os.path.relpath(flamegraph_dir, start=report_dir)).as_posix()
+    with os.scandir(flamegraph_dir) as it:
+        flamegraph_files = {
+            e.name.replace("flamegraph-", "").replace(".svg", ""):
+            f"{flamegraph_rel}/{e.name}"
+            for e in it if e.name.endswith(".svg")
+        }
+
+    # ----- build dataframes (independent inputs, parsed concurrently) -------
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        stat_fut  = ex.submit(parse_perf_stat, stat_file)
+        funcs_fut = ex.submit(parse_collapsed_stacks, collapsed_file)
+        gb_fut    = ex.submit(parse_google_benchmark, gb_path)
+        # heap_fut  = ex.submit(parse_valgrind_massif, valgrind_path)
+    stat_df      = stat_fut.result()
+    top_funcs_df = funcs_fut.result()
+    gb_df        = gb_fut.result()
+    # heap_df      = heap_fut.result()
+
+    # ----- ship plotly.js once per plotly version, shared by every report ---
+    from plotly import __version__ as plotly_version
+    plotly_js = report_dir.parent / f"plotly-{plotly_version}.min.js"
+    if not plotly_js.exists():
+        from plotly.offline import get_plotlyjs
+        # temp name + rename: a concurrent run never links a half-written bundle
+        tmp = plotly_js.with_name(f"{plotly_js.name}.{os.getpid()}.tmp")
+        tmp.write_text(get_plotlyjs(), encoding="utf-8")
+        os.replace(tmp, plotly_js)
 
     # ----- render HTML via Jinja2 -------------------------------------------
-    tpl_dir = Path(__file__).resolve().parent.parent / "tpl"
-    env = Environment(
-        loader=FileSystemLoader(tpl_dir),
-        autoescape=select_autoescape(['html'])
-    )
-    template = env.get_template("report.html")
+    template = _report_template()
 
-    html = template.render(
+    output_path = report_dir / "report.html"
+    template.stream(
         project_name=cfg.get("project_name", "UnnamedProject"),
         version=version,
+        plotly_js=f"../{plotly_js.name}",
         timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         flamegraph_links=flamegraph_files,
-        cache_stats_div=generate_bar_chart(stat_df, "Metric", "Value", "Cache / Branch / CPU Stats"),
-        top_funcs_div=generate_bar_chart(top_funcs_df, "Function", "Samples", "Top Hot Functions"),
-        gb_chart_div=generate_bar_chart(gb_df, "Benchmark", "CPU Time (ns)", "Google Benchmark Results"),
-        # heap_chart_div=generate_bar_chart(heap_df, "Snapshot",
-        #                                   "Heap Size (Bytes)",
-        #                                   "Heap Allocation Over Time")
-    )
-
-    output_path = report_dir / "report.html"
-    output_path.write_text(html, encoding="utf-8")
+        charts={
+            "cache_stats": generate_bar_chart(*_xy(stat_df, "Metric", "Value"),
+                                              "Cache / Branch / CPU Stats", "Metric", "Value"),
+            "top_funcs":   generate_bar_chart(*_xy(top_funcs_df, "Function", "Samples"),
+                                              "Top Hot Functions", "Function", "Samples"),
+            "gb_chart":    generate_bar_chart(*_xy(gb_df, "Benchmark", "CPU Time (ns)"),
+                                              "Google Benchmark Results", "Benchmark", "CPU Time (ns)"),
+            # "heap_chart": generate_bar_chart(*_xy(heap_df, "Snapshot", "Heap Size (Bytes)"),
+            #                                  "Heap Allocation Over Time",
+            #                                  "Snapshot", "Heap Size (Bytes)"),
+        },
+    ).dump(str(output_path), encoding="utf-8")
     return str(output_path)
 
 
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Long-lived front end for generate_report: pandas, plotly and jinja2 are
+# imported (and the template compiled) once per host instead of once per CI job.
+
+import argparse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+from generate_report import _loads, _report_template, generate_report
+
+TOOL_ROOT = Path(__file__).resolve().parent.parent
+MAX_BODY_BYTES = 64 * 1024      # a request is a handful of short strings
+
+
+def _warm_up():
+    """Pay the import / template-compile cost up front, before the first request."""
+    import numpy, pandas, plotly.graph_objects, plotly.offline  # noqa: F401
+    _report_template()
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    """
+    POST a JSON body {"dst": ..., "ver": ...[, "config": ..., "data": ...]} (same
+    meaning as the CLI flags); the reply body is the path of the generated report.
+    Paths must be absolute: they are resolved on the server, not the client.
+    """
+
+    def do_POST(self):
+        try:
+            # never read() an unchecked length: -1 would block until the client
+            # hangs up, and the server handles one request at a time
+            length = int(self.headers["Content-Length"])
+            if not 0 <= length <= MAX_BODY_BYTES:
+                raise ValueError(f"Content-Length must be 0..{MAX_BODY_BYTES}, got {length}")
+            req = _loads(self.rfile.read(length))
+            if not isinstance(req, dict):
+                raise TypeError("body must be a JSON object")
+            kwargs = dict(
+                config_path=req.get("config", str(TOOL_ROOT / "cfg/default.json")),
+                data_root=req.get("data", str(TOOL_ROOT)),
+                dst_root=req["dst"],
+                version=req["ver"],
+            )
+            for key in ("config_path", "data_root", "dst_root"):
+                if not isinstance(kwargs[key], str):
+                    raise TypeError(f"{key} must be a string: {kwargs[key]!r}")
+                if not Path(kwargs[key]).is_absolute():
+                    raise ValueError(f"{key} must be an absolute path: {kwargs[key]!r}")
+            # ver becomes the rpt/<ver> folder name: one plain path component only,
+            # or a client could write the report anywhere the server can
+            ver = kwargs["version"]
+            if not isinstance(ver, str) or not ver or ver in (".", "..") or Path(ver).name != ver:
+                raise ValueError(f"ver must be a single folder name: {ver!r}")
+        except (ValueError, KeyError, TypeError) as exc:
+            self._reply(400, f"bad request: {exc!r}")
+            return
+
+        try:
+            report_path = generate_report(**kwargs)
+        except Exception as exc:
+            self._reply(500, f"report failed: {exc!r}")
+            return
+        self._reply(200, report_path)
+
+    def _reply(self, status, text):
+        body = (text + "\n").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Serve generate_report over HTTP to keep imports warm"
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', '-p', type=int, default=8765)
+    args = parser.parse_args()
+
+    _warm_up()
+    # single-threaded on purpose: requests are handled one at a time, so two
+    # reports never race for the same rpt/<version> folder
+    with HTTPServer((args.host, args.port), ReportHandler) as server:
+        print(f"serving reports on http://{args.host}:{args.port}", flush=True)
+        server.serve_forever()
@@ -0,0 +1,97 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import generate_report as g  # noqa: E402
+
+
+def test_parse_perf_stat_quoted_command_in_header(tmp_path):
+    # the header echoes the profiled command; an unbalanced quote must not
+    # be treated as the start of a quoted field
+    stat = tmp_path / "perf-stat.txt"
+    stat.write_text(
+        " Performance counter stats for 'sh -c \"echo hi':\n"
+        "\n"
+        "           627,433      cache-references\n"
+        "     <not counted>      cache-misses\n"
+        "       0.614910132 seconds time elapsed\n"
+    )
+
+    df = g.parse_perf_stat(stat)
+
+    assert df["Metric"].tolist() == ["cache-references", "seconds"]
+    assert df["Value"].tolist() == [627433.0, 0.614910132]
+
+
+def test_parse_google_benchmark_non_finite_values(tmp_path):
+    # Google Benchmark writes bare NaN / Infinity, which strict parsers reject
+    bench = tmp_path / "benchmark.json"
+    bench.write_text(
+        '{"benchmarks": ['
+        '{"name": "BM_a", "cpu_time": 12.5, "items_per_second": Infinity},'
+        '{"name": "BM_b", "cpu_time": 7.0, "bytes_per_second": NaN}'
+        ']}'
+    )
+
+    df = g.parse_google_benchmark(bench)
+
+    assert df["Benchmark"].tolist() == ["BM_a", "BM_b"]
+    assert df["CPU Time (ns)"].tolist() == [12.5, 7.0]
+
+
+def test_feather_cache_is_keyed_by_version(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    stat = tmp_path / "perf-stat.txt"
+    stat.write_text("  1,000  cache-references\n")
+    g.parse_perf_stat(stat)
+    cached = tmp_path / f"perf-stat.txt.v{g.FEATHER_CACHE_VERSION}.feather"
+    # readable by other users / CI accounts sharing gen/, not mkstemp's 0600
+    assert cached.stat().st_mode & 0o777 == 0o666 & ~g._UMASK
+
+    # change the source but keep it older than the cache: mtime alone keeps
+    # serving the old result, a version bump must not
+    cached_mtime = (tmp_path / f"perf-stat.txt.v{g.FEATHER_CACHE_VERSION}.feather").stat().st_mtime
+    stat.write_text("  2,000  cache-references\n")
+    os.utime(stat, (cached_mtime - 10, cached_mtime - 10))
+    assert g.parse_perf_stat(stat)["Value"].tolist() == [1000.0]
+
+    monkeypatch.setattr(g, "FEATHER_CACHE_VERSION", g.FEATHER_CACHE_VERSION + 1)
+    assert g.parse_perf_stat(stat)["Value"].tolist() == [2000.0]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_parse_collapsed_stacks_rejects_non_integer_counts(tmp_path):
+    collapsed = tmp_path / "collapsed.txt"
+    collapsed.write_text(
+        "main;std::map<int, int>::find 3\n"
+        "main;work 1e3\n"
+        "main;work 1.5\n"
+        "main;work inf\n"
+        "main;std::map<int, int>::find 2\n"
+    )
+
+    df = g.parse_collapsed_stacks(collapsed)
+
+    assert dict(zip(df["Function"], df["Samples"])) == {
+        "main": 5, "std::map<int, int>::find": 5}
+
+
+def test_parse_collapsed_stacks_without_counts(tmp_path):
+    collapsed = tmp_path / "collapsed.txt"
+    collapsed.write_text("no-count-here\n")
+
+    assert g.parse_collapsed_stacks(collapsed).empty
+
+
+def test_parse_perf_stat_skips_value_without_metric(tmp_path):
+    stat = tmp_path / "perf-stat.txt"
+    stat.write_text("  12345\n 5 cycles\n")
+
+    df = g.parse_perf_stat(stat)
+
+    assert df["Metric"].tolist() == ["cycles"]
+    assert df["Value"].tolist() == [5.0]
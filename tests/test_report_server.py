@@ -0,0 +1,102 @@
+import http.client
+import json
+import sys
+import threading
+from http.server import HTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import report_server  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), report_server.ReportHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _post(address, body, content_length=None):
+    conn = http.client.HTTPConnection(*address, timeout=10)
+    conn.putrequest("POST", "/")
+    if content_length is None:
+        content_length = str(len(body))
+    if content_length is not False:
+        conn.putheader("Content-Length", content_length)
+    conn.endheaders()
+    conn.send(body)
+    resp = conn.getresponse()
+    status, text = resp.status, resp.read().decode("utf-8").strip()
+    conn.close()
+    return status, text
+
+
+def _data_root(tmp_path):
+    root = tmp_path / "data"
+    for sub in ("stat", "collapsed", "flamegraph"):
+        (root / "gen" / sub).mkdir(parents=True)
+    (root / "gen/stat/perf-stat-1.txt").write_text("  1,000  cache-references\n")
+    (root / "gen/collapsed/collapsed-1.txt").write_text("main;work 3\n")
+    (root / "gen/flamegraph/flamegraph-1.svg").write_text("<svg/>")
+    config = root / "cfg.json"
+    config.write_text(json.dumps({"paths": {
+        "perf_stat": "gen/stat",
+        "collapsed": "gen/collapsed",
+        "flamegraph": "gen/flamegraph",
+        "report_output": "rpt",
+    }}))
+    return root, config
+
+
+def test_non_object_body(server):
+    status, text = _post(server, b"[1]")
+    assert status == 400
+    assert "JSON object" in text
+
+
+def test_relative_path(server):
+    status, text = _post(server, json.dumps({"dst": "../x", "ver": "v1"}).encode())
+    assert status == 400
+    assert "absolute" in text
+
+
+@pytest.mark.parametrize("content_length", ["-1", "abc", False,
+                                            str(report_server.MAX_BODY_BYTES + 1)])
+def test_bad_content_length(server, content_length):
+    status, _ = _post(server, b"", content_length=content_length)
+    assert status == 400
+
+
+@pytest.mark.parametrize("ver", ["../../evil", "a/b", "..", ".", "", 5])
+def test_path_traversal_version(server, tmp_path, ver):
+    body = json.dumps({"dst": str(tmp_path / "dst"), "ver": ver}).encode()
+    status, _ = _post(server, body)
+    assert status == 400
+    assert not (tmp_path / "evil").exists()
+
+
+def test_non_string_path(server):
+    status, _ = _post(server, json.dumps({"dst": 5, "ver": "v1"}).encode())
+    assert status == 400
+
+
+def test_generates_report(server, tmp_path):
+    root, config = _data_root(tmp_path)
+    dst = tmp_path / "dst"
+    body = json.dumps({"dst": str(dst), "ver": "v1",
+                       "config": str(config), "data": str(root)}).encode()
+
+    status, text = _post(server, body)
+
+    assert status == 200
+    assert text == str((dst / "rpt/v1/report.html").resolve())
+    assert Path(text).is_file()
+    # plotly.js is shared under rpt/, not copied into every report folder
+    assert len(list((dst / "rpt").glob("plotly-*.min.js"))) == 1
+    assert not list((dst / "rpt/v1").glob("*.js"))